@@ -3,17 +3,46 @@
 Версия 1.0 для компании "Евроальянс"
 """
 
+import asyncio
+import collections
+import os
+import sys
 import json
 import hashlib
-from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import math
+import time
+import uuid
+import weakref
+from datetime import date, datetime
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 from abc import ABC, abstractmethod
 import re
 
+import numpy as np
+import orjson
+
+try:
+    from numba import njit
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    # Numba опциональна: без нее работают чистые NumPy-реализации
+    _NUMBA_AVAILABLE = False
+
 # ==================== МОДЕЛЬ ДАННЫХ ====================
 
-@dataclass
+# Шаблоны валидации компилируются один раз при загрузке модуля
+_FIO_RE = re.compile(r'^[А-ЯЁ][а-яё]+\s[А-ЯЁ][а-яё]+\s[А-ЯЁ][а-яё]+$')
+_PASSPORT_SERIES_RE = re.compile(r'^\d{4}$')
+_PASSPORT_NUMBER_RE = re.compile(r'^\d{6}$')
+
+@dataclass(slots=True, frozen=True)
 class ClientData:
     """Конфиденциальные данные клиента"""
     full_name: str
@@ -25,13 +54,21 @@ class ClientData:
     monthly_income: float
     employment_type: str  # 'employed', 'self_employed', 'business_owner'
     experience_months: int
-    
+    _hash: str = field(init=False, repr=False, compare=False, default='')
+
+    def __post_init__(self):
+        # Объект неизменяемый, поэтому хеш считается один раз при создании
+        data_string = f"{self.passport_series}{self.passport_number}{self.birth_date}"
+        object.__setattr__(self, '_hash',
+                           hashlib.blake2b(data_string.encode(), digest_size=8).hexdigest())
+
     def validate(self) -> Tuple[bool, str]:
         """Валидация введенных данных"""
-        if not re.match(r'^[А-ЯЁ][а-яё]+\s[А-ЯЁ][а-яё]+\s[А-ЯЁ][а-яё]+$', self.full_name):
+        if not _FIO_RE.match(self.full_name):
             return False, "ФИО должно быть в формате: Фамилия Имя Отчество"
-        
-        if not re.match(r'^\d{4}\s\d{6}$', f"{self.passport_series} {self.passport_number}"):
+
+        if not (_PASSPORT_SERIES_RE.match(self.passport_series)
+                and _PASSPORT_NUMBER_RE.match(self.passport_number)):
             return False, "Паспорт должен быть в формате: 1234 567890"
             
         if self.monthly_income < 15000:
@@ -41,10 +78,9 @@ class ClientData:
     
     def get_hash(self) -> str:
         """Хеширование персональных данных для безопасности"""
-        data_string = f"{self.passport_series}{self.passport_number}{self.birth_date}"
-        return hashlib.sha256(data_string.encode()).hexdigest()[:16]
+        return self._hash
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Vehicle:
     """Данные об автомобиле"""
     brand: str
@@ -68,7 +104,7 @@ class Vehicle:
             years = months / 12
             return self.price * (1 - years * 0.15)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CalculationParameters:
     """Параметры расчета"""
     financing_type: str  # 'credit' или 'leasing'
@@ -83,7 +119,7 @@ class CalculationParameters:
     def financed_amount(self) -> float:
         return self.amount - self.initial_payment
 
-@dataclass
+@dataclass(slots=True)
 class CalculationResult:
     """Результаты расчета"""
     monthly_payment: float
@@ -97,7 +133,12 @@ class CalculationResult:
     calculation_id: str
     
     def to_dict(self) -> Dict:
-        return asdict(self)
+        # Поверхностный словарь по списку полей: все значения уже примитивы,
+        # рекурсивное копирование строк графика (как в asdict) не требуется
+        return {name: getattr(self, name) for name in _RESULT_FIELDS}
+
+# Имена полей результата вычисляются один раз при создании класса
+_RESULT_FIELDS = tuple(f.name for f in fields(CalculationResult))
 
 # ==================== БАЗОВЫЕ КЛАССЫ ====================
 
@@ -119,17 +160,138 @@ class BaseScoringEngine(ABC):
     def assess_client(self, client: ClientData, params: CalculationParameters) -> Tuple[float, str]:
         pass
 
+# ==================== ЧИСЛОВОЕ ЯДРО ====================
+
+# Сквозной счетчик расчетов: ID уникальны без strftime на каждый вызов
+_CALC_COUNTER = itertools.count(1)
+
+_BASE_RATES = {
+    'credit': {'new': 0.159, 'used': 0.189},
+    'leasing': {'new': 0.149, 'used': 0.179}
+}
+
+@lru_cache(maxsize=256)
+def _resolved_rate(financing_type: str, category: str, months: int) -> float:
+    """Базовая ставка с корректировкой на срок (кешируется по ключу запроса)"""
+    base_rate = _BASE_RATES[financing_type][category]
+
+    if months > 60:
+        base_rate += 0.02
+    elif months < 24:
+        base_rate -= 0.01
+
+    return base_rate
+
+def _annuity_payment(amount: float, annual_rate: float, months: int) -> float:
+    """Аннуитетный платеж: ядро без обращений к объектам Python"""
+    monthly_rate = annual_rate / 12
+    # (1+r)^n - 1 через expm1/log1p: одно возведение в степень вместо двух
+    # и без катастрофической потери точности при малых месячных ставках
+    g = math.expm1(months * math.log1p(monthly_rate))
+    return amount * monthly_rate * (g + 1) / g
+
+def _amort_kernel(amount: float, monthly_rate: float, monthly_payment: float, n: int):
+    """Ядро амортизации: массивы процентов, тела долга и остатка по месяцам"""
+    interest = np.empty(n)
+    principal = np.empty(n)
+    balance = np.empty(n)
+    current_balance = amount
+    for i in range(n):
+        interest[i] = current_balance * monthly_rate
+        principal[i] = monthly_payment - interest[i]
+        current_balance -= principal[i]
+        balance[i] = current_balance
+    return interest, principal, balance
+
+def _solve_apr(principal: float, payment: float, months: int, rate_hint: float,
+               residual: float) -> float:
+    """Месячная ставка из потока платежей (метод Ньютона)
+
+    Решает уравнение приведенной стоимости M*(1-v)/r + R*v = P + R,
+    где v = (1+r)^-n: аннуитет M гасит только P, выкупная стоимость R
+    приходит разовым платежом в конце срока. При R = 0 это обычное
+    P*r*(1+r)^n/((1+r)^n - 1) = M; квадратичная сходимость дает
+    ~1e-10 точности за несколько итераций.
+    """
+    disbursed = principal + residual
+    r = rate_hint if rate_hint > 0 else 0.01
+    for _ in range(12):
+        v = (1 + r) ** (-months)
+        f = payment * (1 - v) / r + residual * v - disbursed
+        dv = -months * v / (1 + r)
+        derivative = payment * (-dv * r - (1 - v)) / (r * r) + residual * dv
+        r -= f / derivative
+        if r < 1e-9:
+            r = 1e-9
+    # Проверка невязки: если корня нет (платеж не соответствует сумме
+    # финансирования), молчаливый возврат прижатой к нулю ставки скрывал бы ошибку
+    v = (1 + r) ** (-months)
+    if abs(payment * (1 - v) / r + residual * v - disbursed) > 1e-6 * disbursed:
+        raise ValueError("Ставка не сошлась: платеж не соответствует сумме финансирования")
+    return r
+
+if _NUMBA_AVAILABLE:
+    # cache=True: компиляция выполняется один раз и переиспользуется между запусками
+    _annuity_payment = njit(cache=True, fastmath=True)(_annuity_payment)
+    _amort_kernel = njit(cache=True, fastmath=True)(_amort_kernel)
+    _solve_apr = njit(cache=True)(_solve_apr)
+else:
+    def _amort_kernel(amount: float, monthly_rate: float, monthly_payment: float, n: int):
+        """Ядро амортизации без Numba: замкнутые формулы на NumPy"""
+        k = np.arange(1, n + 1, dtype=np.float64)
+        growth = (1 + monthly_rate) ** k
+        balance = amount * growth - monthly_payment * (growth - 1) / monthly_rate
+        interest = np.empty_like(k)
+        interest[0] = amount * monthly_rate
+        interest[1:] = balance[:-1] * monthly_rate
+        principal = monthly_payment - interest
+        return interest, principal, balance
+
 # ==================== РЕАЛИЗАЦИЯ КАЛЬКУЛЯТОРА ====================
 
 class SmartCalculator(BaseCalculator):
     """Умный калькулятор с поддержкой кредита и лизинга"""
     
     def __init__(self):
-        self.base_rates = {
-            'credit': {'new': 0.159, 'used': 0.189},
-            'leasing': {'new': 0.149, 'used': 0.179}
+        self.base_rates = _BASE_RATES
+        # Читаемый префикс форматируется один раз на весь жизненный цикл
+        self._id_prefix = datetime.now().strftime("%Y%m%d%H%M%S")
+        # Специализированные версии расчета: каскад ветвлений по типу
+        # финансирования и страховкам свернут заранее в замыкания
+        self._calc_fns = {
+            key: self._make_calc_fn(*key)
+            for key in itertools.product(
+                ('credit', 'leasing'), ('new', 'used'), (True, False), (True, False)
+            )
         }
-        
+
+    def _make_calc_fn(self, financing_type: str, category: str,
+                      insurance_included: bool, life_insurance: bool):
+        """Специализация calculate под конкретную комбинацию параметров"""
+        # Комиссии сворачиваются в константы: страховка КАСКО - 0.5% годовых,
+        # страхование жизни - фиксированная сумма
+        fee_rate = 0.005 / 12 if insurance_included else 0.0
+        fee_fixed = 500.0 if life_insurance else 0.0
+
+        if financing_type == 'leasing':
+            def calc(params: CalculationParameters) -> CalculationResult:
+                base_rate = _resolved_rate(financing_type, category, params.months)
+                residual_value = (params.vehicle.get_residual_value(params.months)
+                                  if params.vehicle else 0)
+                return self._build_result(
+                    params, base_rate, params.financed_amount - residual_value,
+                    residual_value, params.amount * fee_rate + fee_fixed, category
+                )
+        else:
+            def calc(params: CalculationParameters) -> CalculationResult:
+                base_rate = _resolved_rate(financing_type, category, params.months)
+                return self._build_result(
+                    params, base_rate, params.financed_amount,
+                    0, params.amount * fee_rate + fee_fixed, category
+                )
+
+        return calc
+
     def validate_parameters(self, params: CalculationParameters) -> Tuple[bool, str]:
         """Валидация параметров расчета"""
         
@@ -149,82 +311,93 @@ class SmartCalculator(BaseCalculator):
     
     def calculate_annuity_payment(self, amount: float, annual_rate: float, months: int) -> float:
         """Расчет аннуитетного платежа"""
+        return _annuity_payment(amount, annual_rate, months)
+    
+    def calculate_effective_rate(self, params: CalculationParameters, monthly_payment: float,
+                                 rate_hint: float = 0.15,
+                                 residual_value: float = 0.0) -> float:
+        """Расчет эффективной процентной ставки (метод Ньютона)
+
+        Для лизинга аннуитет гасит финансируемую сумму без выкупной
+        стоимости, а сама выкупная стоимость учитывается разовым
+        платежом в конце срока.
+        """
+        monthly_rate = _solve_apr(
+            params.financed_amount - residual_value, monthly_payment,
+            params.months, rate_hint / 12, residual_value
+        )
+        # Приведение месячной ставки к эффективной годовой
+        return math.expm1(12 * math.log1p(monthly_rate)) * 100
+    
+    def generate_schedule(self, params: CalculationParameters, monthly_payment: float,
+                          annual_rate: float, fees: float = 0.0) -> List[Dict]:
+        """Генерация графика платежей (векторизованный расчет через NumPy)
+
+        monthly_payment - аннуитетный платеж по долгу без комиссий;
+        fees - страховые платежи, идущие отдельной строкой графика.
+        """
+        n = params.months
         monthly_rate = annual_rate / 12
-        coefficient = (monthly_rate * (1 + monthly_rate) ** months) / ((1 + monthly_rate) ** months - 1)
-        return amount * coefficient
-    
-    def calculate_effective_rate(self, params: CalculationParameters, monthly_payment: float) -> float:
-        """Расчет эффективной процентной ставки (упрощенный)"""
-        total_cost = monthly_payment * params.months
-        return ((total_cost / params.financed_amount) - 1) * (12 / params.months) * 100
-    
-    def generate_schedule(self, params: CalculationParameters, monthly_payment: float, annual_rate: float) -> List[Dict]:
-        """Генерация графика платежей"""
-        schedule = []
-        balance = params.financed_amount
-        monthly_rate = annual_rate / 12
-        current_date = datetime.now()
-        
-        for month in range(1, params.months + 1):
-            interest = balance * monthly_rate
-            principal = monthly_payment - interest
-            balance -= principal
-            
-            schedule.append({
+
+        # Амортизация считается по чистому аннуитету: комиссии не гасят долг
+        interest, principal, balance = _amort_kernel(
+            params.financed_amount, monthly_rate, monthly_payment, n
+        )
+
+        # Даты платежей через арифметику ординалов: быстрее timedelta + strftime
+        base_ordinal = datetime.now().toordinal()
+        dates = []
+        for m in range(1, n + 1):
+            d = date.fromordinal(base_ordinal + 30 * m)
+            dates.append(f"{d.day:02d}.{d.month:02d}.{d.year}")
+        payment = round(monthly_payment + fees, 2)
+        fees = round(fees, 2)
+        principal = np.round(principal, 2).tolist()
+        interest = np.round(interest, 2).tolist()
+        balance = (np.maximum(0, np.round(balance, 2)) + 0.0).tolist()  # +0.0 убирает -0.0
+
+        return [
+            {
                 'month': month,
-                'date': (current_date + timedelta(days=30*month)).strftime('%d.%m.%Y'),
-                'payment': round(monthly_payment, 2),
-                'principal': round(principal, 2),
-                'interest': round(interest, 2),
-                'balance': max(0, round(balance, 2))
-            })
-        
-        return schedule
+                'date': dates[month - 1],
+                'payment': payment,
+                'principal': principal[month - 1],
+                'interest': interest[month - 1],
+                'fees': fees,
+                'balance': balance[month - 1]
+            }
+            for month in range(1, n + 1)
+        ]
     
     def calculate(self, params: CalculationParameters) -> CalculationResult:
         """Основной метод расчета"""
-        
-        # Определяем базовую ставку
+
+        # Диспетчеризация на заранее специализированное замыкание:
+        # одна выборка из словаря вместо каскада ветвлений
         vehicle_type = params.vehicle.category if params.vehicle else 'used'
-        base_rate = self.base_rates[params.financing_type][vehicle_type]
-        
-        # Корректировка ставки в зависимости от срока
-        if params.months > 60:
-            base_rate += 0.02
-        elif params.months < 24:
-            base_rate -= 0.01
-            
-        # Корректировка для лизинга с учетом выкупной стоимости
-        if params.financing_type == 'leasing' and params.vehicle:
-            residual_value = params.vehicle.get_residual_value(params.months)
-            financed_amount = params.financed_amount - residual_value
-        else:
-            financed_amount = params.financed_amount
-            residual_value = 0
-        
-        # Расчет платежа
-        monthly_payment = self.calculate_annuity_payment(financed_amount, base_rate, params.months)
-        
-        # Добавляем страховку если включена
-        if params.insurance_included:
-            insurance_cost = params.amount * 0.005 / 12  # 0.5% годовых
-            monthly_payment += insurance_cost
-            
-        if params.life_insurance:
-            life_insurance_cost = 500  # фиксированная сумма
-            monthly_payment += life_insurance_cost
-        
-        # Расчет итоговых значений
-        total_payment = monthly_payment * params.months
-        if params.financing_type == 'leasing':
-            total_payment += residual_value
-            
+        calc_fn = self._calc_fns[(params.financing_type, vehicle_type,
+                                  params.insurance_included, params.life_insurance)]
+        return calc_fn(params)
+
+    def _build_result(self, params: CalculationParameters, base_rate: float,
+                      financed_amount: float, residual_value: float,
+                      fees: float, vehicle_type: str) -> CalculationResult:
+        """Сборка результата по уже определенной ставке и комиссиям"""
+
+        # Расчет платежа по долгу (без комиссий); страховки идут отдельной
+        # строкой и не участвуют в амортизации долга
+        loan_payment = self.calculate_annuity_payment(financed_amount, base_rate, params.months)
+        monthly_payment = loan_payment + fees
+
+        # Расчет итоговых значений (для лизинга - с выкупной стоимостью)
+        total_payment = monthly_payment * params.months + residual_value
         overpayment = total_payment - params.financed_amount
-        effective_rate = self.calculate_effective_rate(params, monthly_payment)
-        
+        effective_rate = self.calculate_effective_rate(params, monthly_payment, base_rate,
+                                                       residual_value)
+
         # Генерация графика
-        schedule = self.generate_schedule(params, monthly_payment, base_rate)
-        
+        schedule = self.generate_schedule(params, loan_payment, base_rate, fees)
+
         # Формирование условий
         conditions = {
             'base_rate': round(base_rate * 100, 1),
@@ -246,10 +419,31 @@ class SmartCalculator(BaseCalculator):
             calculation_id=self._generate_calculation_id()
         )
     
+    def calculate_summary(self, params: CalculationParameters) -> Tuple[float, float]:
+        """Сокращенный расчет: (ежемесячный платеж, базовая ставка) без графика"""
+        vehicle_type = params.vehicle.category if params.vehicle else 'used'
+        base_rate = _resolved_rate(params.financing_type, vehicle_type, params.months)
+
+        financed_amount = params.financed_amount
+        if params.financing_type == 'leasing' and params.vehicle:
+            financed_amount -= params.vehicle.get_residual_value(params.months)
+
+        monthly_payment = self.calculate_annuity_payment(financed_amount, base_rate, params.months)
+
+        if params.insurance_included:
+            monthly_payment += params.amount * 0.005 / 12
+        if params.life_insurance:
+            monthly_payment += 500
+
+        return round(monthly_payment, 2), base_rate
+
+    def quick_monthly_payment(self, params: CalculationParameters) -> float:
+        """Только ежемесячный платеж: без графика и объекта результата"""
+        return self.calculate_summary(params)[0]
+
     def _generate_calculation_id(self) -> str:
         """Генерация уникального ID расчета"""
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        return f"CALC_{timestamp}"
+        return f"CALC_{self._id_prefix}_{next(_CALC_COUNTER)}"
 
 # ==================== СИСТЕМА ПРЕДОДОБРЕНИЯ ====================
 
@@ -257,6 +451,8 @@ class ScoringSystem(BaseScoringEngine):
     """Система скоринга для предварительного одобрения"""
     
     def __init__(self):
+        # Общий калькулятор вместо создания нового на каждую оценку
+        self.calculator = SmartCalculator()
         self.rules = {
             'min_income_ratio': 0.4,  # Платеж не более 40% от дохода
             'min_age': 21,
@@ -283,11 +479,10 @@ class ScoringSystem(BaseScoringEngine):
             score -= 20
             reasons.append(f"Возраст более {self.rules['max_age']} лет")
         
-        # Проверка дохода
-        calculator = SmartCalculator()
-        temp_result = calculator.calculate(params)
-        
-        payment_to_income_ratio = temp_result.monthly_payment / client.monthly_income
+        # Проверка дохода: график платежей для скоринга не нужен
+        monthly_payment = self.calculator.quick_monthly_payment(params)
+
+        payment_to_income_ratio = monthly_payment / client.monthly_income
         
         if payment_to_income_ratio > self.rules['min_income_ratio']:
             reduction = (payment_to_income_ratio - self.rules['min_income_ratio']) * 100
@@ -327,6 +522,7 @@ class ProductConfigurator:
     
     def __init__(self, config_file: str = 'products_config.json'):
         self.products = self._load_products(config_file)
+        self._availability_cache: Dict[Tuple, bool] = {}
     
     def _load_products(self, config_file: str) -> Dict:
         """Загрузка конфигурации продуктов из файла"""
@@ -377,36 +573,47 @@ class ProductConfigurator:
         """Получение списка доступных продуктов для клиента и автомобиля"""
         available = []
         
-        # Проверяем кредитные продукты
+        # Проверяем кредитные продукты: исходные словари конфигурации
+        # не мутируются, наружу уходят копии с тегом типа
         for product in self.products.get('credit_products', []):
             if self._is_product_available(product, vehicle, client_data):
-                product['type'] = 'credit'
-                available.append(product)
-        
+                available.append({**product, 'type': 'credit'})
+
         # Проверяем лизинговые продукты
         for product in self.products.get('leasing_products', []):
             if self._is_product_available(product, vehicle, client_data):
-                product['type'] = 'leasing'
-                available.append(product)
+                available.append({**product, 'type': 'leasing'})
         
         return available
     
     def _is_product_available(self, product: Dict, vehicle: Vehicle, client_data: ClientData) -> bool:
-        """Проверка доступности продукта"""
-        
+        """Проверка доступности продукта (результат кешируется)"""
+
+        cache_key = (product.get('id'), vehicle.category, vehicle.price)
+        cached = self._availability_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        available = self._check_product(product, vehicle)
+        self._availability_cache[cache_key] = available
+        return available
+
+    def _check_product(self, product: Dict, vehicle: Vehicle) -> bool:
+        """Непосредственная проверка условий продукта"""
+
         # Проверка типа автомобиля
         if vehicle.category not in product.get('available_for', []):
             return False
-        
+
         # Проверка суммы
         if vehicle.price < product.get('min_amount', 0):
             return False
         if vehicle.price > product.get('max_amount', float('inf')):
             return False
-        
+
         # Проверка минимального первоначального взноса
         min_initial_amount = vehicle.price * product.get('min_initial', 0)
-        
+
         return True
 
 # ==================== ОСНОВНОЙ КЛАСС ПРИЛОЖЕНИЯ ====================
@@ -423,15 +630,22 @@ class SmartFinanceApp:
     def start_new_session(self):
         """Начало новой сессии расчета"""
         self.current_session = {
-            'session_id': datetime.now().strftime("%Y%m%d%H%M%S"),
+            # Наносекундная метка монотонна в рамках процесса и не требует strftime
+            'session_id': str(time.time_ns()),
             'client_data': None,
             'vehicle': None,
             'parameters': None,
             'result': None
         }
     
-    def input_vehicle_data(self) -> Vehicle:
-        """Ввод данных об автомобиле"""
+    def input_vehicle_data(self, source: Optional[Dict] = None) -> Vehicle:
+        """Ввод данных об автомобиле
+
+        source - готовый словарь полей для пакетного режима без input()
+        """
+        if source is not None:
+            return Vehicle(**source)
+
         print("\n" + "="*50)
         print("ВВОД ДАННЫХ ОБ АВТОМОБИЛЕ")
         print("="*50)
@@ -452,8 +666,18 @@ class SmartFinanceApp:
             category=category
         )
     
-    def input_client_data(self) -> ClientData:
-        """Ввод данных клиента"""
+    def input_client_data(self, source: Optional[Dict] = None) -> ClientData:
+        """Ввод данных клиента
+
+        source - готовый словарь полей для пакетного режима без input()
+        """
+        if source is not None:
+            client = ClientData(**source)
+            is_valid, message = client.validate()
+            if not is_valid:
+                raise ValueError(message)
+            return client
+
         print("\n" + "="*50)
         print("ВВОД ПЕРСОНАЛЬНЫХ ДАННЫХ")
         print("="*50)
@@ -489,8 +713,15 @@ class SmartFinanceApp:
         
         return client
     
-    def input_calculation_parameters(self, vehicle: Vehicle) -> CalculationParameters:
-        """Ввод параметров расчета"""
+    def input_calculation_parameters(self, vehicle: Vehicle,
+                                     source: Optional[Dict] = None) -> CalculationParameters:
+        """Ввод параметров расчета
+
+        source - готовый словарь полей для пакетного режима без input()
+        """
+        if source is not None:
+            return CalculationParameters(amount=vehicle.price, vehicle=vehicle, **source)
+
         print("\n" + "="*50)
         print("ПАРАМЕТРЫ ФИНАНСИРОВАНИЯ")
         print("="*50)
@@ -586,8 +817,13 @@ class SmartFinanceApp:
         save = input("\nСохранить результаты расчета? (yes/no): ").lower()
         if save == 'yes':
             filename = f"calculation_{result.calculation_id}.json"
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(result.to_dict(), f, ensure_ascii=False, indent=2)
+            with open(filename, 'wb') as f:
+                # orjson сериализует dataclass напрямую: строки графика уходят
+                # в файл по ссылке, без промежуточного словаря-копии
+                f.write(orjson.dumps(
+                    result,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+                ))
             print(f"Результаты сохранены в файл: {filename}")
     
     def get_recommendations(self, client: ClientData, vehicle: Vehicle) -> List[Dict]:
@@ -598,35 +834,48 @@ class SmartFinanceApp:
         print("РЕКОМЕНДУЕМЫЕ ПРОДУКТЫ")
         print("="*50)
         
+        if not available_products:
+            return []
+
+        # Векторизованный расчет платежей сразу по всем продуктам:
+        # полный calculate() с графиком здесь не нужен, показываем только платеж и ставку
+        months = [min(60, p.get('max_months', 60)) for p in available_products]
+        rates = np.array([
+            _resolved_rate(p['type'], vehicle.category, m)
+            for p, m in zip(available_products, months)
+        ])
+        financed = []
+        for product, term in zip(available_products, months):
+            amount = vehicle.price * (1 - product.get('min_initial', 0.15))
+            if product['type'] == 'leasing':
+                amount -= vehicle.get_residual_value(term)
+            financed.append(amount)
+
+        nper = np.array(months, dtype=np.float64)
+        monthly_rates = rates / 12
+        growth = (1 + monthly_rates) ** nper
+        payments = np.array(financed) * monthly_rates * growth / (growth - 1)
+        payments += vehicle.price * 0.005 / 12  # страховка КАСКО включена по умолчанию
+        payments = np.round(payments, 2)
+
         recommendations = []
-        for product in available_products:
-            # Рассчитываем для каждого продукта
-            params = CalculationParameters(
-                financing_type=product['type'],
-                amount=vehicle.price,
-                initial_payment=vehicle.price * product.get('min_initial', 0.15),
-                months=min(60, product.get('max_months', 60)),
-                vehicle=vehicle
-            )
-            
-            result = self.calculator.calculate(params)
-            
+        for product, payment, rate in zip(available_products, payments, rates):
             recommendation = {
                 'product_name': product['name'],
                 'type': product['type'],
-                'monthly_payment': result.monthly_payment,
-                'rate': result.conditions['base_rate'],
+                'monthly_payment': float(payment),
+                'rate': round(rate * 100, 1),
                 'recommendation_reason': self._generate_recommendation_reason(client, product)
             }
-            
+
             recommendations.append(recommendation)
-            
+
             # Вывод рекомендации
             print(f"\n{product['name']} ({product['type']}):")
-            print(f"  Ежемесячный платеж: {result.monthly_payment:,.2f} руб.")
-            print(f"  Ставка: {result.conditions['base_rate']}%")
+            print(f"  Ежемесячный платеж: {recommendation['monthly_payment']:,.2f} руб.")
+            print(f"  Ставка: {recommendation['rate']}%")
             print(f"  Рекомендация: {recommendation['recommendation_reason']}")
-        
+
         return recommendations
     
     def _generate_recommendation_reason(self, client: ClientData, product: Dict) -> str:
@@ -644,7 +893,7 @@ class SmartFinanceApp:
         
         return "; ".join(reasons) if reasons else "стандартное предложение"
     
-    def run(self):
+    async def run(self):
         """Основной метод запуска приложения"""
         print("="*60)
         print("УМНЫЙ КОНФИГУРАТОР И КАЛЬКУЛЯТОР КРЕДИТА/ЛИЗИНГА")
@@ -688,51 +937,380 @@ from datetime import datetime
 from typing import Optional, List
 import json
 
+# SQL горячего пути выносится в константы: текст разбирается сервером один раз
+# на соединение (см. DatabaseManager._init_connection), дальше только bind+execute
+_INSERT_CLIENT_SQL = """
+    INSERT INTO clients (
+        passport_hash,
+        full_name_encrypted,
+        monthly_income,
+        employment_type,
+        experience_months
+    ) VALUES ($1, $2, $3, $4, $5)
+    RETURNING id
+"""
+
+_INSERT_CALC_SQL = """
+    INSERT INTO calculations (
+        client_id, vehicle_id, financing_type,
+        amount, initial_payment, months,
+        monthly_payment, total_payment, effective_rate,
+        approval_status, approval_score,
+        insurance_included, life_insurance, conditions
+    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
+    RETURNING id
+"""
+
+# Вариант с ID, сгенерированным на клиенте: зная calculation_id заранее,
+# расчет и сессию можно писать параллельно на двух соединениях пула
+_INSERT_CALC_WITH_ID_SQL = """
+    INSERT INTO calculations (
+        id, client_id, vehicle_id, financing_type,
+        amount, initial_payment, months,
+        monthly_payment, total_payment, effective_rate,
+        approval_status, approval_score,
+        insurance_included, life_insurance, conditions
+    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
+"""
+
+_INSERT_SESSION_SQL = """
+    INSERT INTO user_sessions (user_id, client_id, calculation_id)
+    VALUES ($1, $2, $3)
+    RETURNING id
+"""
+
+# Расчет и сессия пишутся одним CTE-запросом: одна поездка в БД вместо двух
+_INSERT_CALC_WITH_SESSION_SQL = """
+    WITH c AS (
+        INSERT INTO calculations (
+            client_id, vehicle_id, financing_type,
+            amount, initial_payment, months,
+            monthly_payment, total_payment, effective_rate,
+            approval_status, approval_score,
+            insurance_included, life_insurance, conditions
+        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
+        RETURNING id
+    )
+    INSERT INTO user_sessions (user_id, client_id, calculation_id)
+    SELECT $15, $1, c.id FROM c
+    RETURNING calculation_id
+"""
+
+# Пакетная вставка расчетов через unnest: вся пачка буфера уходит
+# одним запросом и возвращает ID в порядке строк
+_BULK_INSERT_CALC_SQL = """
+    INSERT INTO calculations (
+        client_id, vehicle_id, financing_type,
+        amount, initial_payment, months,
+        monthly_payment, total_payment, effective_rate,
+        approval_status, approval_score,
+        insurance_included, life_insurance, conditions
+    )
+    SELECT * FROM unnest(
+        $1::uuid[], $2::uuid[], $3::varchar[],
+        $4::numeric[], $5::numeric[], $6::int[],
+        $7::numeric[], $8::numeric[], $9::numeric[],
+        $10::varchar[], $11::numeric[],
+        $12::bool[], $13::bool[], $14::jsonb[]
+    )
+    RETURNING id
+"""
+
+# Полная цепочка автомобиль -> расчет -> сессия в одном запросе:
+# три поездки в БД сворачиваются в одну; upsert по VIN всегда
+# возвращает строку, поэтому цепочка не рвется на повторном автомобиле
+_INSERT_FULL_CALC_SQL = """
+    WITH v AS (
+        INSERT INTO vehicles (brand, model, year, price, vin_hash, category)
+        VALUES ($1, $2, $3, $4, $5, $6)
+        ON CONFLICT (vin_hash) DO UPDATE SET price = EXCLUDED.price
+        RETURNING id
+    ), c AS (
+        INSERT INTO calculations (
+            client_id, vehicle_id, financing_type,
+            amount, initial_payment, months,
+            monthly_payment, total_payment, effective_rate,
+            approval_status, approval_score,
+            insurance_included, life_insurance, conditions
+        )
+        SELECT $7, v.id, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19 FROM v
+        RETURNING id
+    )
+    INSERT INTO user_sessions (user_id, client_id, calculation_id)
+    SELECT $20, $7, c.id FROM c
+    RETURNING calculation_id, (SELECT id FROM v) AS vehicle_id
+"""
+
 class DatabaseManager:
+    # Параметры буфера отложенной вставки
+    FLUSH_INTERVAL = 0.05   # секунд
+    FLUSH_MAX_ROWS = 500
+    # Предел кеша автомобилей: примерно размер активного стока автосалона
+    VEHICLE_CACHE_MAX = 1024
+
     def __init__(self, dsn: str):
         self.dsn = dsn
         self.pool = None
-    
+        # За pgbouncer в transaction-режиме именованные подготовленные
+        # выражения теряются между транзакциями и ломают горячий путь
+        self._behind_pgbouncer = os.environ.get('DB_POOLER') == 'pgbouncer'
+        self._insert_buf: List[Tuple[tuple, asyncio.Future]] = []
+        self._flusher_task: Optional[asyncio.Task] = None
+        # Прогретые PreparedStatement по соединениям: conn.prepare() идет
+        # мимо LRU-кеша выражений, поэтому handle нужно держать и
+        # использовать явно, иначе прогрев не работает
+        self._prepared: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        # LRU-кеш ID автомобилей по хешу VIN (ограничен VEHICLE_CACHE_MAX):
+        # повторное сохранение той же машины не ходит в БД за vehicle_id.
+        # Попадание в кеш пропускает и upsert цены по ON CONFLICT, так что
+        # изменение цены известного VIN не перезаписывается, пока запись
+        # живет в кеше - осознанный размен свежести на скорость
+        self._vehicle_cache: "collections.OrderedDict[str, str]" = collections.OrderedDict()
+
     async def connect(self):
-        self.pool = await asyncpg.create_pool(self.dsn)
-    
+        # Пул создается один раз на процесс: рукопожатие TCP+TLS+auth
+        # амортизируется между всеми запросами приложения
+        pool_kwargs = dict(
+            min_size=10,
+            max_size=50,
+            max_queries=50000,
+            max_inactive_connection_lifetime=300,
+            command_timeout=60,
+            statement_cache_size=1024,
+            init=self._init_connection,
+            # Запросы короткие - JIT самого PostgreSQL не окупается
+            server_settings={'jit': 'off'}
+        )
+
+        if self._behind_pgbouncer:
+            # Кеш выражений выключается полностью: иначе под нагрузкой
+            # всплывает 'prepared statement "__asyncpg_stmt_X__" does not exist'
+            pool_kwargs.update(
+                statement_cache_size=0,
+                max_cached_statement_lifetime=0,
+                max_cacheable_statement_size=0
+            )
+
+        self.pool = await asyncpg.create_pool(self.dsn, **pool_kwargs)
+
+    async def close(self):
+        """Закрытие пула при остановке приложения"""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    async def _init_connection(self, conn):
+        """Настройка каждого нового соединения пула"""
+        # jsonb-параметры принимаются как обычные словари: сериализацию
+        # выполняет orjson в кодеке - быстрее stdlib и без ensure_ascii
+        await conn.set_type_codec(
+            'jsonb',
+            encoder=lambda value: orjson.dumps(value).decode(),
+            decoder=orjson.loads,
+            schema='pg_catalog'
+        )
+
+        # Прогрев всех выражений горячего пути (бессмысленен за pgbouncer):
+        # первое сохранение на свежем соединении не платит Parse+Describe,
+        # что убирает всплески хвостовой задержки после простоя пула.
+        # Handle обязаны жить дальше: conn.prepare() не кладет выражение
+        # в LRU-кеш соединения, а брошенный PreparedStatement при сборке
+        # мусора закрывает серверное выражение
+        if not self._behind_pgbouncer:
+            self._prepared[conn] = {
+                sql: await conn.prepare(sql)
+                for sql in (_INSERT_CLIENT_SQL, _INSERT_CALC_SQL, _INSERT_SESSION_SQL,
+                            _INSERT_CALC_WITH_ID_SQL, _INSERT_CALC_WITH_SESSION_SQL,
+                            _INSERT_FULL_CALC_SQL)
+            }
+
+    async def _fetchval(self, conn, sql: str, *args):
+        """fetchval через прогретый PreparedStatement соединения
+
+        Пул отдает соединение в обертке-прокси, ключ кеша - само соединение.
+        """
+        stmts = self._prepared.get(getattr(conn, '_con', conn))
+        if stmts is None:
+            return await conn.fetchval(sql, *args)
+        return await stmts[sql].fetchval(*args)
+
+    async def _fetchrow(self, conn, sql: str, *args):
+        """fetchrow через прогретый PreparedStatement соединения"""
+        stmts = self._prepared.get(getattr(conn, '_con', conn))
+        if stmts is None:
+            return await conn.fetchrow(sql, *args)
+        return await stmts[sql].fetchrow(*args)
+
     async def save_client(self, client_data: dict) -> str:
         """Сохранение клиента с шифрованием критичных полей"""
         async with self.pool.acquire() as conn:
             # В реальности используем pgcrypto для шифрования
-            client_id = await conn.fetchval("""
-                INSERT INTO clients (
-                    passport_hash, 
-                    full_name_encrypted,
-                    monthly_income,
-                    employment_type,
-                    experience_months
-                ) VALUES ($1, $2, $3, $4, $5)
-                RETURNING id
-            """, 
-            client_data['passport_hash'],
-            client_data['encrypted_name'],
-            client_data['monthly_income'],
-            client_data['employment_type'],
-            client_data['experience_months'])
-            
+            client_id = await self._fetchval(
+                conn, _INSERT_CLIENT_SQL,
+                client_data['passport_hash'],
+                client_data['encrypted_name'],
+                client_data['monthly_income'],
+                client_data['employment_type'],
+                client_data['experience_months'])
+
             return client_id
-    
-    async def save_calculation(self, calculation_data: dict) -> str:
-        """Сохранение расчета"""
+
+    async def save_calculation(self, client_id, vehicle_id, financing_type, amount,
+                               initial_payment, months, monthly_payment, total_payment,
+                               effective_rate, approval_status, approval_score,
+                               insurance_included, life_insurance, conditions) -> str:
+        """Сохранение расчета (аргументы в порядке $N подготовленного INSERT)"""
         async with self.pool.acquire() as conn:
-            calc_id = await conn.fetchval("""
-                INSERT INTO calculations (
-                    client_id, vehicle_id, financing_type,
+            calc_id = await self._fetchval(
+                conn, _INSERT_CALC_SQL, client_id, vehicle_id, financing_type, amount,
+                initial_payment, months, monthly_payment, total_payment,
+                effective_rate, approval_status, approval_score,
+                insurance_included, life_insurance, conditions)
+
+            return calc_id
+
+    async def save_calculation_with_session(self, client_id, vehicle_id, financing_type,
+                                            amount, initial_payment, months,
+                                            monthly_payment, total_payment, effective_rate,
+                                            approval_status, approval_score,
+                                            insurance_included, life_insurance, conditions,
+                                            user_id) -> str:
+        """Сохранение расчета вместе с сессией одним запросом
+
+        CTE-запрос атомарен сам по себе и уходит одной последовательностью
+        Parse/Bind/Execute/Sync: явный BEGIN/COMMIT добавлял бы еще две
+        поездки протокола на каждое сохранение.
+        """
+        async with self.pool.acquire() as conn:
+            return await self._fetchval(
+                conn, _INSERT_CALC_WITH_SESSION_SQL,
+                client_id, vehicle_id, financing_type, amount,
+                initial_payment, months, monthly_payment, total_payment,
+                effective_rate, approval_status, approval_score,
+                insurance_included, life_insurance, conditions,
+                user_id)
+
+    async def save_calculation_and_session(self, client_id, vehicle_id, financing_type,
+                                           amount, initial_payment, months,
+                                           monthly_payment, total_payment, effective_rate,
+                                           approval_status, approval_score,
+                                           insurance_included, life_insurance, conditions,
+                                           user_id) -> str:
+        """Параллельная запись расчета и сессии на двух соединениях пула
+
+        calculation_id генерируется на клиенте (uuid4), поэтому вставка
+        сессии не ждет ID от вставки расчета: обе уходят одновременно,
+        и время пути сохранения падает с t1+t2 до max(t1, t2).
+        """
+        calculation_id = str(uuid.uuid4())
+
+        async def _insert_calc():
+            async with self.pool.acquire() as conn:
+                await self._fetchrow(
+                    conn, _INSERT_CALC_WITH_ID_SQL,
+                    calculation_id, client_id, vehicle_id, financing_type,
                     amount, initial_payment, months,
                     monthly_payment, total_payment, effective_rate,
-                    approval_status, approval_score, session_data
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
-                RETURNING id
-            """, *calculation_data.values())
-            
-            return calc_id
-    
+                    approval_status, approval_score,
+                    insurance_included, life_insurance, conditions)
+
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(_insert_calc())
+            tg.create_task(self.save_session(user_id, client_id, calculation_id))
+
+        return calculation_id
+
+    async def save_calculation_buffered(self, calculation_data: dict) -> str:
+        """Сохранение расчета через буфер отложенной вставки
+
+        Строки копятся до FLUSH_INTERVAL / FLUSH_MAX_ROWS и уходят в БД
+        одной пакетной вставкой: до ~50 мс задержки в обмен на кратный
+        рост пропускной способности при всплеске параллельных сохранений.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._insert_buf.append((tuple(calculation_data.values()), future))
+
+        if len(self._insert_buf) >= self.FLUSH_MAX_ROWS:
+            await self._flush_inserts()
+        elif self._flusher_task is None or self._flusher_task.done():
+            self._flusher_task = asyncio.create_task(self._delayed_flush())
+
+        return await future
+
+    async def _delayed_flush(self):
+        """Фоновый сброс буфера по таймеру"""
+        await asyncio.sleep(self.FLUSH_INTERVAL)
+        await self._flush_inserts()
+
+    async def _flush_inserts(self):
+        """Запись накопленных строк одной пакетной вставкой"""
+        pending = self._insert_buf
+        self._insert_buf = []
+        if not pending:
+            return
+
+        # Транспонируем строки буфера в массивы-колонки для unnest
+        columns = [list(column) for column in zip(*(row for row, _ in pending))]
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch(_BULK_INSERT_CALC_SQL, *columns)
+        except Exception as exc:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, future), row in zip(pending, rows):
+            if not future.done():
+                future.set_result(row['id'])
+
+    async def save_full_calculation(self, vehicle_data: dict,
+                                    calculation_data: dict, user_id: str) -> str:
+        """Сохранение автомобиля, расчета и сессии одной CTE-цепочкой
+
+        Для уже сохраненного VIN вставка автомобиля пропускается целиком:
+        vehicle_id берется из кеша и пишутся только расчет и сессия.
+        """
+        vehicle_id = self._vehicle_cache.get(vehicle_data['vin_hash'])
+        if vehicle_id is not None:
+            self._vehicle_cache.move_to_end(vehicle_data['vin_hash'])
+            values = list(calculation_data.values())
+            values.insert(1, vehicle_id)
+            return await self.save_calculation_and_session(*values, user_id)
+
+        # Одиночный CTE-запрос атомарен: явная транзакция не нужна
+        async with self.pool.acquire() as conn:
+            row = await self._fetchrow(
+                conn, _INSERT_FULL_CALC_SQL,
+                *vehicle_data.values(),
+                *calculation_data.values(),
+                user_id)
+
+        self._vehicle_cache[vehicle_data['vin_hash']] = row['vehicle_id']
+        if len(self._vehicle_cache) > self.VEHICLE_CACHE_MAX:
+            self._vehicle_cache.popitem(last=False)
+        return row['calculation_id']
+
+    async def save_session(self, user_id: str, client_id: str, calculation_id: str) -> str:
+        """Сохранение сессии менеджера"""
+        async with self.pool.acquire() as conn:
+            return await self._fetchval(conn, _INSERT_SESSION_SQL,
+                                        user_id, client_id, calculation_id)
+
+    async def save_calculations_bulk(self, rows: List[dict]) -> None:
+        """Массовое сохранение расчетов одним COPY вместо INSERT на строку"""
+        if not rows:
+            return
+
+        columns = list(rows[0].keys())
+        async with self.pool.acquire() as conn:
+            # COPY идет по бинарному протоколу PostgreSQL без разбора каждой строки
+            await conn.copy_records_to_table(
+                'calculations',
+                records=[tuple(row[col] for col in columns) for row in rows],
+                columns=columns
+            )
+
     async def get_client_calculations(self, passport_hash: str) -> List[dict]:
         """Получение истории расчетов клиента"""
         async with self.pool.acquire() as conn:
@@ -758,7 +1336,7 @@ class DatabaseManager:
                     COUNT(*) as request_count,
                     SUM(CASE WHEN approval_status = 'pre_approved' THEN 1 ELSE 0 END) as approved_count
                 FROM calculations
-                WHERE created_at >= NOW() - INTERVAL '$1 days'
+                WHERE created_at >= NOW() - make_interval(days => $1)
                 GROUP BY financing_type
                 ORDER BY request_count DESC
             """, days)
@@ -766,6 +1344,15 @@ class DatabaseManager:
             return [dict(row) for row in rows]
 
 # app_with_db.py - основной класс
+
+def _compute_score(client: ClientData, params: CalculationParameters) -> Tuple[float, str]:
+    """Скоринг для выполнения в отдельном процессе
+
+    Функция модульного уровня, чтобы ProcessPoolExecutor мог ее
+    сериализовать; ScoringSystem создается в воркере один раз на вызов.
+    """
+    return ScoringSystem().assess_client(client, params)
+
 class SmartFinanceAppWithDB:
     def __init__(self, db_manager: DatabaseManager):
         self.calculator = SmartCalculator()
@@ -773,23 +1360,60 @@ class SmartFinanceAppWithDB:
         self.configurator = ProductConfigurator()
         self.db = db_manager
         self.current_user = None  # Текущий менеджер
-    
+        # Очередь уведомлений о сохранении: горячий путь делает только
+        # append, вывод выполняет фоновая задача одной записью
+        self._notice_q: collections.deque = collections.deque(maxlen=10_000)
+        self._notice_drainer: Optional[asyncio.Task] = None
+        # Пул процессов для CPU-работы: скоринг не держит событийный цикл
+        self._cpu_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+    def _notify_saved(self, calculation_id: str):
+        """Уведомление о сохранении без syscall на горячем пути"""
+        self._notice_q.append(calculation_id)
+        if self._notice_drainer is None or self._notice_drainer.done():
+            self._notice_drainer = asyncio.create_task(self._drain_notices())
+
+    async def _drain_notices(self):
+        """Пакетный вывод накопленных уведомлений"""
+        await asyncio.sleep(0.01)
+        if not self._notice_q:
+            return
+        ids = []
+        while self._notice_q:
+            ids.append(str(self._notice_q.popleft()))
+        log.info("Сохранено расчетов: %d. ID: %s", len(ids), ", ".join(ids))
+
     async def run_with_db(self):
         """Обновленный поток с сохранением в БД"""
         # ... предыдущие шаги ввода данных ...
         
-        # После расчета сохраняем в БД
-        client_id = await self.db.save_client({
+        # Сохранение клиента стартует сразу и идет параллельно
+        # с расчетом и скорингом: await только в точке сборки INSERT
+        client_task = asyncio.create_task(self.db.save_client({
             'passport_hash': client.get_hash(),
             'encrypted_name': self._encrypt_field(client.full_name),
             'monthly_income': client.monthly_income,
             'employment_type': client.employment_type,
             'experience_months': client.experience_months
-        })
-        
-        calculation_id = await self.db.save_calculation({
+        }))
+
+        # Скоринг - чистый CPU: уходит на отдельное ядро и перекрывается
+        # с записью клиента, событийный цикл остается свободен для I/O
+        score, approval_status = await asyncio.get_running_loop().run_in_executor(
+            self._cpu_pool, _compute_score, client, params)
+
+        client_id = await client_task
+
+        # Автомобиль, расчет и сессия уходят в БД одним запросом
+        calculation_id = await self.db.save_full_calculation({
+            'brand': vehicle.brand,
+            'model': vehicle.model,
+            'year': vehicle.year,
+            'price': vehicle.price,
+            'vin_hash': hashlib.blake2b(vehicle.vin.encode(), digest_size=8).hexdigest(),
+            'category': vehicle.category
+        }, {
             'client_id': client_id,
-            'vehicle_id': await self._save_vehicle(vehicle),
             'financing_type': params.financing_type,
             'amount': params.amount,
             'initial_payment': params.initial_payment,
@@ -799,37 +1423,65 @@ class SmartFinanceAppWithDB:
             'effective_rate': result.effective_rate,
             'approval_status': approval_status,
             'approval_score': score,
-            'session_data': json.dumps({
-                'insurance_included': params.insurance_included,
-                'life_insurance': params.life_insurance,
-                'conditions': result.conditions
-            })
-        })
-        
-        # Сохранение сессии
-        await self.db.save_session({
-            'user_id': self.current_user,
-            'client_id': client_id,
-            'calculation_id': calculation_id
-        })
-        
-        print(f"Расчет сохранен в базе. ID: {calculation_id}")
+            'insurance_included': params.insurance_included,
+            'life_insurance': params.life_insurance,
+            # Словарь уходит как есть: jsonb-кодек соединения сам сериализует
+            'conditions': result.conditions
+        }, self.current_user)
+
+        # Уведомление - чисто отладочный вывод: под -O/-OO ветка
+        # выбрасывается компилятором из байткода целиком
+        if __debug__:
+            self._notify_saved(calculation_id)
 
 # ==================== ТОЧКА ВХОДА ====================
 
-def main():
+log = logging.getLogger("credit")
+
+def _setup_logging() -> QueueListener:
+    """Логирование через очередь: корутины только кладут запись,
+    запись в stdout выполняет фоновый поток"""
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    return listener
+
+if sys.platform == 'linux':
+    try:
+        # uvloop (libuv) заметно быстрее стандартного селектора для
+        # asyncpg-нагрузки; свежие сборки libuv батчат отправку в сокет
+        # через io_uring на ядрах 5.11+, на старых прозрачно откатываясь
+        # на epoll. Вне Linux остается стандартный событийный цикл.
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+async def main():
     """Точка входа в приложение"""
+    listener = _setup_logging()
     app = SmartFinanceApp()
-    
+
     try:
-        app.run()
+        await app.run()
     except KeyboardInterrupt:
         print("\n\nПрограмма прервана пользователем")
-    except Exception as e:
-        print(f"\nПроизошла ошибка: {str(e)}")
-        print("Пожалуйста, свяжитесь с технической поддержкой")
+    except asyncio.CancelledError:
+        # Отмену задач не подавляем: иначе ломается структурная отмена asyncio
+        raise
+    except Exception:
+        # Трассировка уходит в лог один раз, ошибка не глотается:
+        # молчаливое подавление провоцировало повторные запуски под нагрузкой
+        log.exception("Произошла ошибка")
+        if __debug__:
+            print("Пожалуйста, свяжитесь с технической поддержкой")
+        raise
     finally:
+        listener.stop()
         print("\nДо свидания!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
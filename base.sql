@@ -171,4 +171,25 @@ SELECT
 FROM calculations
 WHERE created_at BETWEEN '2025-12-28' AND '2025-12-30 23:59:59'
 GROUP BY DATE(created_at)
-ORDER BY calculation_date;
\ No newline at end of file
+ORDER BY calculation_date;
+
+-- 7. Миграция: типизированные колонки вместо session_data
+-- Флаги страховок - обычные BOOLEAN, условия расчета - отдельный JSONB;
+-- запись и чтение больше не ходят через извлечение из session_data
+ALTER TABLE calculations ADD COLUMN insurance_included BOOLEAN;
+ALTER TABLE calculations ADD COLUMN life_insurance BOOLEAN;
+ALTER TABLE calculations ADD COLUMN conditions JSONB;
+
+UPDATE calculations SET
+    insurance_included = (session_data->>'insurance_included')::boolean,
+    life_insurance = (session_data->>'life_insurance')::boolean,
+    conditions = session_data - 'insurance_included' - 'life_insurance';
+
+ALTER TABLE calculations DROP COLUMN session_data;
+
+-- 8. Миграция: параллельная запись расчета и сессии
+-- calculation_id генерируется приложением (uuid4), вставки расчета и
+-- сессии идут одновременно на разных соединениях; внешний ключ на еще
+-- не закоммиченный расчет при таком порядке не проверить - снимаем его,
+-- связность пары обеспечивает приложение, пишущее обе строки вместе
+ALTER TABLE user_sessions DROP CONSTRAINT user_sessions_calculation_id_fkey;